@@ -1,10 +1,22 @@
+import hashlib
 import re
-from typing import List, Optional, Dict, Tuple
+import time
+from collections import OrderedDict
+from typing import List, Optional, Dict, Pattern, Tuple
 from langdetect import detect, LangDetectException
 from .models import AnalyzeResult, Threat, AnalyzeMetadata
-from .gemini import gemini_enrich
+from .gemini import forensic_watermark, gemini_enrich
 from .config import settings
-from .threat_intel import threat_intel
+from .threat_intel import get_threat_intel
+from .logging_client import logger
+
+# Optional RE2 backend (google-re2) for linear-time threat pattern matching
+_re2 = None
+if settings.regex_backend == "re2":
+    try:
+        import re2 as _re2
+    except ImportError:
+        logger.warning("GUARDIAN_REGEX_BACKEND=re2 but google-re2 is not installed; using re")
 
 
 # Category weights based on severity (higher = more severe)
@@ -26,6 +38,15 @@ CATEGORY_WEIGHTS = {
     "none": 0.0                  # No threat detected
 }
 
+# Entity extraction patterns for graph analysis
+ENTITY_PATTERNS = {
+    'urls': re.compile(r'https?://[\w\-./%]+'),
+    'mentions': re.compile(r'@[\w]+'),
+    'hashtags': re.compile(r'#[\w]+'),
+    'ips': re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b'),
+    'emails': re.compile(r'[\w\.-]+@[\w\.-]+'),
+}
+
 # Graph-based threat intelligence analysis
 def analyze_graph(text: str) -> dict:
     """
@@ -39,13 +60,7 @@ def analyze_graph(text: str) -> dict:
     - Propagation score calculation
     """
     # Entity extraction with expanded patterns
-    entities = {
-        'urls': re.findall(r'https?://[\w\-./%]+', text),
-        'mentions': re.findall(r'@[\w]+', text),
-        'hashtags': re.findall(r'#[\w]+', text),
-        'ips': re.findall(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', text),
-        'emails': re.findall(r'[\w\.-]+@[\w\.-]+', text)
-    }
+    entities = {name: pattern.findall(text) for name, pattern in ENTITY_PATTERNS.items()}
     
     # Calculate entity frequencies and relationships
     entity_freqs = {}
@@ -321,6 +336,51 @@ THREAT_PATTERNS = {
 }
 
 
+def _compile_pattern(pattern: str):
+    """
+    Compile a threat pattern with the configured regex backend.
+    
+    RE2 word classes and boundaries are ASCII-only, so non-ASCII patterns,
+    and any pattern RE2 rejects, stay on the stdlib engine.
+    """
+    if _re2 is not None and pattern.isascii():
+        try:
+            return _re2.compile(f"(?im){pattern}")
+        except _re2.error:
+            pass
+    return re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+
+
+def _compile_threat_patterns(
+    patterns: Dict[str, Dict[str, List[Dict]]]
+) -> Dict[str, Dict[str, List[Tuple[Pattern, Dict]]]]:
+    """
+    Compile every threat pattern once, keeping its metadata alongside.
+    
+    Patterns that contain "://" can only match text with a URL in it, so
+    they are flagged with requires_url to let analyze_patterns skip them.
+    """
+    return {
+        language: {
+            category: [
+                (
+                    _compile_pattern(info["pattern"]),
+                    {**info, "requires_url": "://" in info["pattern"]},
+                )
+                for info in infos
+            ]
+            for category, infos in categories.items()
+        }
+        for language, categories in patterns.items()
+    }
+
+
+COMPILED_THREAT_PATTERNS = _compile_threat_patterns(THREAT_PATTERNS)
+
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
 def detect_language(text: str) -> str:
     """
     Detect the language of the input text using langdetect library.
@@ -328,8 +388,8 @@ def detect_language(text: str) -> str:
     """
     try:
         # Clean text for better detection
-        clean_text = re.sub(r'[^\w\s]', ' ', text.lower())
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+        clean_text = _NON_WORD_RE.sub(' ', text.lower())
+        clean_text = _WHITESPACE_RE.sub(' ', clean_text).strip()
         
         # Minimum text length for reliable detection
         if len(clean_text.split()) < 3:
@@ -398,13 +458,19 @@ def analyze_patterns(text: str, language: str) -> List[Threat]:
     """
     threats = []
     matched_positions = set()  # Track matched positions to avoid overlaps
+    social_matches = 0  # Running count, so repeat matches don't rescan `threats`
     
     # Get patterns for the detected language, fallback to English
-    language_patterns = THREAT_PATTERNS.get(language, THREAT_PATTERNS.get("en", {}))
+    language_patterns = COMPILED_THREAT_PATTERNS.get(
+        language, COMPILED_THREAT_PATTERNS.get("en", {})
+    )
+    # Every URL pattern needs a scheme separator or a "www." host
+    has_url = "://" in text or "www." in text.lower()
     
     for category, patterns in language_patterns.items():
-        for pattern_info in patterns:
-            pattern = re.compile(pattern_info["pattern"], re.IGNORECASE | re.MULTILINE)
+        for pattern, pattern_info in patterns:
+            if pattern_info["requires_url"] and not has_url:
+                continue
             for match in pattern.finditer(text):
                 match_start, match_end = match.span()
                 overlap = any(
@@ -423,9 +489,9 @@ def analyze_patterns(text: str, language: str) -> List[Threat]:
                         # Increase confidence for multiple pattern matches in social engineering
                         if category == "social_engineering":
                             # Check if we have other social engineering matches
-                            social_matches = sum(1 for t in threats if t.category == "social_engineering")
                             if social_matches > 0:
                                 confidence = min(0.95, confidence * (1.1 + (0.05 * social_matches)))
+                            social_matches += 1
                         
                         threats.append(Threat(
                             category=category,
@@ -449,10 +515,66 @@ def analyze_patterns(text: str, language: str) -> List[Threat]:
 
 from .privacy_utils import apply_privacy_preserving_transforms, get_explainability_info
 
+# LRU of recent results keyed by a digest of the request, oldest first
+_analysis_cache: "OrderedDict[bytes, Tuple[float, AnalyzeResult]]" = OrderedDict()
+
+
+def _analysis_cache_key(
+    text: str, model_version: Optional[str], compliance_mode: Optional[str]
+) -> bytes:
+    h = hashlib.blake2b(text.encode("utf-8"), digest_size=16)
+    h.update(f"\0{model_version}\0{compliance_mode}".encode("utf-8"))
+    return h.digest()
+
+
+def clear_analysis_cache() -> None:
+    """Drop all memoized results, e.g. to measure the uncached path."""
+    _analysis_cache.clear()
+
+
 async def analyze_text(
     text: str,
     model_version: Optional[str] = None,
     compliance_mode: Optional[str] = None,
+    use_cache: bool = True,
+) -> AnalyzeResult:
+    """
+    Analyze text, reusing the result of an identical recent request.
+
+    Results that lack Gemini enrichment (e.g. after a transient Gemini
+    failure) are not cached. Callers get their own copy of the result, with
+    a forensic watermark issued for this request.
+    """
+    use_cache = use_cache and settings.analysis_cache_size > 0 and settings.analysis_cache_ttl_seconds > 0
+    if not use_cache:
+        return await _analyze_text(text, model_version, compliance_mode)
+
+    key = _analysis_cache_key(text, model_version, compliance_mode)
+    now = time.monotonic()
+    entry = _analysis_cache.get(key)
+    if entry is not None:
+        stored_at, cached = entry
+        if now - stored_at < settings.analysis_cache_ttl_seconds:
+            _analysis_cache.move_to_end(key)
+            hit = cached.model_copy(deep=True)
+            # The watermark attributes a single request, so never reuse it
+            hit.metadata.forensic_watermark = forensic_watermark(text)[0]
+            return hit
+        del _analysis_cache[key]
+
+    result = await _analyze_text(text, model_version, compliance_mode)
+    enriched = result.metadata.gemini_analysis is not None or not settings.gemini_enrichment_enabled
+    if enriched and result.metadata.gemini_error is None:
+        _analysis_cache[key] = (now, result.model_copy(deep=True))
+        while len(_analysis_cache) > settings.analysis_cache_size:
+            _analysis_cache.popitem(last=False)
+    return result
+
+
+async def _analyze_text(
+    text: str,
+    model_version: Optional[str] = None,
+    compliance_mode: Optional[str] = None,
 ) -> AnalyzeResult:
     """
     Enhanced threat analysis with multi-language support, dynamic confidence scoring,
@@ -466,6 +588,8 @@ async def analyze_text(
     detected_language = detect_language(text)
     
     # Get threat intelligence analysis
+    threat_intel = get_threat_intel()
+    await threat_intel.maybe_refresh()
     intel_results = threat_intel.analyze_text(text)
     
     # Analyze patterns for detected language
@@ -474,10 +598,10 @@ async def analyze_text(
     # Add threats from threat intelligence
     for match in intel_results["matches"]:
         threat = Threat(
-            category=match["category"],
+            category=match.category,
             confidence_score=0.85,  # High confidence for known patterns
-            details=f"{match['category']}: '{match['matched_text']}'",
-            matched_patterns=[{"pattern": match["pattern"], "matches": [match["matched_text"]]}]
+            details=f"{match.category}: '{match.matched_text}'",
+            matched_patterns=[{"pattern": match.pattern, "matches": [match.matched_text]}]
         )
         threats.append(threat)
     
@@ -485,7 +609,6 @@ async def analyze_text(
     gemini_result = await gemini_enrich(text)
     
     # Forensic watermarking and attribution
-    from .gemini import forensic_watermark
     watermark_id, watermarked_text = forensic_watermark(text)
     attribution = None # TODO: Implement stylometric attribution
     
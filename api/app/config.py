@@ -80,8 +80,17 @@ class Settings:
         self.phishtank_api_key = os.getenv("PHISHTANK_API_KEY", "")
         self.openphish_enabled = os.getenv("OPENPHISH_ENABLED", "True").lower() in ("true", "1", "t")
         self.threat_intel_cache_ttl = int(os.getenv("THREAT_INTEL_CACHE_TTL", "86400"))  # 24 hours
+        self.max_intel_cache_mb = int(os.getenv("MAX_INTEL_CACHE_MB", "50"))
         self.enable_external_threat_intel = os.getenv("ENABLE_EXTERNAL_THREAT_INTEL", "True").lower() in ("true", "1", "t")
 
+        # Classifier
+        self.regex_backend = os.getenv("GUARDIAN_REGEX_BACKEND", "re").lower()  # re or re2
+        if self.regex_backend not in ("re", "re2"):
+            raise ValueError(f"Invalid GUARDIAN_REGEX_BACKEND: {self.regex_backend}")
+        # Identical requests within the TTL reuse the previous result; 0 disables
+        self.analysis_cache_size = int(os.getenv("ANALYSIS_CACHE_SIZE", "4096"))
+        self.analysis_cache_ttl_seconds = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "300"))
+
         # Privacy and Compliance
         self.privacy_mode = os.getenv("PRIVACY_MODE", "standard")  # standard, strict, or minimal
         self.data_retention_days = int(os.getenv("DATA_RETENTION_DAYS", "30"))
@@ -31,6 +31,38 @@ CACHE_TTL = timedelta(minutes=5)  # Cache entries expire after 5 minutes
 MAX_CACHE_SIZE = 1000  # Maximum number of cached responses
 TIMEOUT_SECONDS = 30  # Default request timeout
 
+class RequestWindow:
+    """
+    Sliding-window request counter with one bucket per second.
+
+    Buckets are indexed by whole seconds of the monotonic clock, so recording
+    is O(1) and counting is a fixed O(window) integer scan.
+    """
+
+    __slots__ = ("window", "counts", "seconds")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.counts = [0] * window
+        self.seconds = [-1] * window  # Second each bucket currently holds
+
+    def record(self, now: int, n: int = 1) -> None:
+        slot = now % self.window
+        if self.seconds[slot] != now:
+            self.seconds[slot] = now
+            self.counts[slot] = 0
+        self.counts[slot] += n
+
+    def count(self, now: int) -> int:
+        cutoff = now - self.window
+        return sum(c for c, sec in zip(self.counts, self.seconds) if sec > cutoff)
+
+    def retry_after(self, now: int) -> int:
+        """Seconds until the oldest counted bucket leaves the window."""
+        cutoff = now - self.window
+        oldest = min((sec for sec in self.seconds if sec > cutoff), default=now)
+        return self.window - (now - oldest)
+
 # Logging helper
 def log_with_context(**context):
     """Create a logger with additional context."""
@@ -41,7 +73,7 @@ def log_with_context(**context):
 
 # Initialize cache and metrics
 response_cache: Dict[str, tuple[JsonResponse, datetime]] = {}
-request_timestamps: Dict[str, List[float]] = defaultdict(list)
+request_windows: Dict[str, RequestWindow] = defaultdict(lambda: RequestWindow(REQUEST_WINDOW))
 
 # Configure Gemini
 model_name = "gemini-pro"
@@ -59,7 +91,7 @@ else:
     genai.configure(api_key=settings.gemini_api_key)
 from .logging_client import logger
 from .models import Threat
-from .gemini_analyzer import GeminiAnalyzer
+from .gemini_analyzer import get_gemini_analyzer
 from .gemini_models import ModelResponseError
 
 # Metrics tracking
@@ -97,47 +129,57 @@ class RequestTimeout(GeminiException):
     """Exception raised when request times out"""
     pass
 
+# Threat level keywords; one regex pass over the text finds all of them
+THREAT_LEVEL_KEYWORDS: Dict[str, ThreatLevel] = {
+    "critical": "Critical", "severe": "Critical", "extreme": "Critical",
+    "high": "High", "serious": "High", "major": "High",
+    "medium": "Medium", "moderate": "Medium", "intermediate": "Medium",
+    "low": "Low", "minor": "Low", "minimal": "Low",
+}
+THREAT_LEVEL_RANK: Dict[str, int] = {"None": 0, "Low": 1, "Medium": 2, "High": 3, "Critical": 4}
+_THREAT_LEVEL_RE = re.compile("|".join(map(re.escape, THREAT_LEVEL_KEYWORDS)))
+
+CONFIDENCE_PATTERNS = [
+    re.compile(r'(\d{1,3})%\s*confidence', re.IGNORECASE),
+    re.compile(r'confidence\s*:\s*(\d{1,3})%', re.IGNORECASE),
+    re.compile(r'confidence\s*score\s*:\s*(\d{1,3})', re.IGNORECASE),
+    re.compile(r'(\d{1,3})\s*percent\s*confident', re.IGNORECASE),
+]
+
+# Fallback confidence by wording, checked in order
+CONFIDENCE_WORDS = {
+    'certain': 95,
+    'highly likely': 85,
+    'likely': 75,
+    'possible': 60,
+    'uncertain': 40,
+    'unlikely': 25,
+    'highly unlikely': 15
+}
+
 def extract_threat_level(text: str) -> ThreatLevel:
     """Extract threat level from text using pattern matching."""
-    text = text.lower()
-    if "critical" in text or "severe" in text or "extreme" in text:
-        return "Critical"
-    elif "high" in text or "serious" in text or "major" in text:
-        return "High"
-    elif "medium" in text or "moderate" in text or "intermediate" in text:
-        return "Medium"
-    elif "low" in text or "minor" in text or "minimal" in text:
-        return "Low"
-    return "None"
+    level: ThreatLevel = "None"
+    for match in _THREAT_LEVEL_RE.finditer(text.lower()):
+        found = THREAT_LEVEL_KEYWORDS[match.group(0)]
+        if found == "Critical":
+            return found
+        if THREAT_LEVEL_RANK[found] > THREAT_LEVEL_RANK[level]:
+            level = found
+    return level
 
 def extract_confidence_score(text: str) -> int:
     """Extract confidence score from text using pattern matching."""
     # Look for percentage patterns
-    patterns = [
-        r'(\d{1,3})%\s*confidence',
-        r'confidence\s*:\s*(\d{1,3})%',
-        r'confidence\s*score\s*:\s*(\d{1,3})',
-        r'(\d{1,3})\s*percent\s*confident'
-    ]
-    
-    for pattern in patterns:
-        if match := re.search(pattern, text, re.IGNORECASE):
+    for pattern in CONFIDENCE_PATTERNS:
+        if match := pattern.search(text):
             score = int(match.group(1))
             return min(max(score, 0), 100)  # Clamp between 0 and 100
     
     # Fallback: Estimate confidence from language used
-    confidence_words = {
-        'certain': 95,
-        'highly likely': 85,
-        'likely': 75,
-        'possible': 60,
-        'uncertain': 40,
-        'unlikely': 25,
-        'highly unlikely': 15
-    }
-    
-    for word, score in confidence_words.items():
-        if word in text.lower():
+    text_lower = text.lower()
+    for word, score in CONFIDENCE_WORDS.items():
+        if word in text_lower:
             return score
             
     return 50  # Default middle confidence if no clear indicators
@@ -282,25 +324,17 @@ def check_rate_limit():
     Raises:
         RateLimitExceeded: If rate limit would be exceeded
     """
-    current_time = time.time()
-    window_start = current_time - REQUEST_WINDOW
-    
-    # Clean old timestamps
-    request_timestamps["api"] = [
-        ts for ts in request_timestamps["api"]
-        if ts > window_start
-    ]
+    now = int(time.monotonic())
+    window = request_windows["api"]
     
     # Check if adding a new request would exceed the limit
-    if len(request_timestamps["api"]) >= MAX_REQUESTS:
-        oldest_timestamp = min(request_timestamps["api"])
-        wait_time = REQUEST_WINDOW - (current_time - oldest_timestamp)
+    if window.count(now) >= MAX_REQUESTS:
+        wait_time = window.retry_after(now)
         raise RateLimitExceeded(
             f"Rate limit exceeded. Try again in {wait_time:.1f} seconds"
         )
     
-    # Add new timestamp
-    request_timestamps["api"].append(current_time)
+    window.record(now)
 
 def update_metrics(metric_name: str, value: Union[int, float] = 1):
     """
@@ -373,6 +407,14 @@ def clean_cache():
         logger.error(f"Error during cache cleaning: {str(e)}")
         # Don't raise the exception - cache cleaning should not break the main functionality
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def content_cache_key(text: str, analysis_type: str) -> str:
+    """Build a response cache key that ignores case and whitespace differences."""
+    normalized = _WHITESPACE_RE.sub(" ", text).strip().lower()
+    digest = hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+    return f"{analysis_type}:{digest}"
+
 def forensic_watermark(text: str) -> tuple[str, str]:
     """
     Add a timestamp and unique identifier watermark to the text for forensic purposes.
@@ -470,6 +512,15 @@ def validate_response(response_data: Dict[str, Any], analysis_type: str = "compr
         logger.error(f"Unexpected error in response validation: {str(e)}")
         raise ResponseParsingException(f"Validation error: {str(e)}")
 
+# Expected confidence (as a fraction) for each threat level
+CONSISTENCY_LEVEL_WEIGHTS: Dict[str, float] = {
+    "Critical": 0.9,
+    "High": 0.7,
+    "Medium": 0.5,
+    "Low": 0.3,
+    "None": 0.1
+}
+
 def calculate_consistency_score(response_data: Dict[str, Any]) -> float:
     """
     Calculate a consistency score for the response based on internal coherence.
@@ -484,15 +535,7 @@ def calculate_consistency_score(response_data: Dict[str, Any]) -> float:
     deductions = []
     
     # Check threat level vs confidence correlation
-    threat_level_weights = {
-        "Critical": 0.9,
-        "High": 0.7,
-        "Medium": 0.5,
-        "Low": 0.3,
-        "None": 0.1
-    }
-    
-    expected_confidence = threat_level_weights[response_data["threatLevel"]] * 100
+    expected_confidence = CONSISTENCY_LEVEL_WEIGHTS[response_data["threatLevel"]] * 100
     actual_confidence = response_data["confidenceScore"]
     confidence_diff = abs(expected_confidence - actual_confidence) / 100
     
@@ -503,18 +546,21 @@ def calculate_consistency_score(response_data: Dict[str, Any]) -> float:
     if "categories" in response_data:
         # Check if concerns match categories
         categories_lower = {cat.lower() for cat in response_data["categories"]}
-        concerns_text = " ".join(response_data["concerns"]).lower()
+        # Lowercase each concern once rather than once per recommendation
+        concerns_lower = [concern.lower() for concern in response_data["concerns"]]
+        concerns_text = " ".join(concerns_lower)
         
         category_mentions = sum(1 for cat in categories_lower if cat in concerns_text)
         if category_mentions < len(categories_lower) * 0.5:  # Less than 50% categories mentioned
             deductions.append(0.1)  # 10% deduction
             
         # Check if recommendations address concerns
-        concerns_addressed = sum(
-            1 for rec in response_data["recommendations"]
-            if any(concern.lower() in rec.lower() for concern in response_data["concerns"])
-        )
-        if concerns_addressed < len(response_data["concerns"]) * 0.5:  # Less than 50% concerns addressed
+        concerns_addressed = 0
+        for rec in response_data["recommendations"]:
+            rec_lower = rec.lower()
+            if any(concern in rec_lower for concern in concerns_lower):
+                concerns_addressed += 1
+        if concerns_addressed < len(concerns_lower) * 0.5:  # Less than 50% concerns addressed
             deductions.append(0.15)  # 15% deduction
     
     # Apply deductions
@@ -600,7 +646,8 @@ async def gemini_enrich(
         text (str): The text content to analyze
         analysis_type (str, optional): Type of analysis ('quick' or 'comprehensive'). Defaults to "comprehensive".
         max_retries (int, optional): Maximum retry attempts. Defaults to 3.
-        cache_key (Optional[str], optional): Cache key for response caching. Defaults to None.
+        cache_key (Optional[str], optional): Cache key for response caching. Defaults to a
+            hash of the normalized text and analysis type.
         timeout (Optional[float], optional): Request timeout in seconds. Defaults to None.
         threats (Optional[List[Threat]], optional): Existing threats to merge with. Defaults to None.
         base_score (Optional[float], optional): Base risk score to consider. Defaults to None.
@@ -727,6 +774,10 @@ async def gemini_enrich(
 
         update_metrics("total_requests")
         
+        # Default to a content-derived key so repeated texts skip the model call
+        if cache_key is None:
+            cache_key = content_cache_key(text, analysis_type)
+        
         # Check cache if cache_key is provided
         if cache_key:
             if cache_key in response_cache:
@@ -776,8 +827,8 @@ async def gemini_enrich(
         watermarked_text = forensic_watermark(text)
             
         try:
-            # Initialize analyzer
-            analyzer = GeminiAnalyzer()
+            # Shared analyzer; the model is initialized once per process
+            analyzer = get_gemini_analyzer()
             
             # Get threat analysis result
             result = await analyzer.analyze_content(
@@ -1134,36 +1185,40 @@ async def batch_analyze_texts(texts: List[str], batch_size: int = 5, max_retries
         )
         max_retries = max(1, retry_budget // len(texts))  # Ensure at least 1 retry
 
+    # Keep up to batch_size requests in flight; a slow text no longer holds
+    # back the start of the next batch
+    semaphore = asyncio.Semaphore(batch_size)
+
+    async def analyze_one(text: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await gemini_enrich(text, max_retries=max_retries)
+
+    # gather preserves input order
+    all_results = await asyncio.gather(
+        *(analyze_one(text) for text in texts), return_exceptions=True
+    )
+
     results = []
     failed_indices = []
 
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i:i + batch_size]
-        tasks = [
-            gemini_enrich(text, max_retries=max_retries)
-            for text in batch
-        ]
-        
-        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Process results and track failures
-        for j, result in enumerate(batch_results):
-            if isinstance(result, Exception):
-                logger.error(f"Failed to analyze text at index {i+j}: {str(result)}")
-                failed_indices.append(i+j)
-                # Add a failure indicator in place of the result
-                results.append({
-                    "error": str(result),
-                    "threatLevel": "Unknown",
-                    "confidenceScore": 0,
-                    "metadata": {
-                        "analysisTimestamp": datetime.utcnow().isoformat(),
-                        "error": True,
-                        "errorType": type(result).__name__
-                    }
-                })
-            else:
-                results.append(result)
+    # Process results and track failures
+    for i, result in enumerate(all_results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to analyze text at index {i}: {str(result)}")
+            failed_indices.append(i)
+            # Add a failure indicator in place of the result
+            results.append({
+                "error": str(result),
+                "threatLevel": "Unknown",
+                "confidenceScore": 0,
+                "metadata": {
+                    "analysisTimestamp": datetime.utcnow().isoformat(),
+                    "error": True,
+                    "errorType": type(result).__name__
+                }
+            })
+        else:
+            results.append(result)
 
     if failed_indices:
         logger.warning(f"Failed to analyze {len(failed_indices)} texts at indices: {failed_indices}")
@@ -10,6 +10,7 @@ import json
 import re
 import asyncio
 import google.generativeai as genai
+from functools import lru_cache
 from typing import Dict, Any, Optional, List, Union
 from datetime import datetime
 from .logging_client import logger
@@ -42,6 +43,13 @@ class GeminiAnalyzer:
         # Configure the Gemini API
         api_key = api_key or settings.gemini_api_key
         genai.configure(api_key=api_key)
+        self._model: Optional[genai.GenerativeModel] = None
+    
+    def _get_model(self) -> genai.GenerativeModel:
+        """Return the model, initializing it (and listing models) on first use only."""
+        if self._model is None:
+            self._model = self._initialize_model()
+        return self._model
     
     def _get_available_models(self) -> List[str]:
         """List available Gemini models."""
@@ -233,8 +241,8 @@ Guidelines:
             ThreatAnalysisResult: The analysis results including threat level and details
         """
         try:
-            # Initialize model
-            model = self._initialize_model()
+            # Reuse the initialized model and its connection
+            model = self._get_model()
             
             # Generate and send prompt
             prompt = self._generate_prompt(content, analysis_type)
@@ -292,4 +300,10 @@ Guidelines:
             logger.error(f"Error during content analysis: {str(e)}")
             if isinstance(e, ModelResponseError):
                 raise
-            raise ModelResponseError(f"Unexpected error during analysis: {str(e)}")
\ No newline at end of file
+            raise ModelResponseError(f"Unexpected error during analysis: {str(e)}")
+
+
+@lru_cache(maxsize=1)
+def get_gemini_analyzer() -> GeminiAnalyzer:
+    """Returns the process-wide GeminiAnalyzer, created on first use."""
+    return GeminiAnalyzer()
@@ -0,0 +1,25 @@
+from typing import Optional
+
+import httpx
+
+# Shared outbound HTTP client, created lazily and closed on app shutdown
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Returns the application-wide AsyncClient, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Closes the shared AsyncClient and its connection pool."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -4,7 +4,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI, HTTPException, Request, Security
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.security import APIKeyHeader
 from prometheus_client import make_asgi_app
 from pydantic import ValidationError
@@ -15,11 +15,13 @@ from .classifier import analyze_text
 from .config import settings
 from .deps import verify_api_key
 from .health_monitor import HealthMonitor
+from .http import close_client
 from .logging_client import LogEntry, logging_client
 from .metrics_collector import metrics_collector
 from .models import AnalyzeRequest, AnalyzeResponse, Threat
 from .rate_limiter import add_rate_limit_headers, rate_limit_combined, memory_store
 from .stats import stats
+from .threat_intel import get_threat_intel
 from .structured_logging import (
     configure_logging,
     correlation_id_var,
@@ -65,11 +67,14 @@ async def lifespan(app: FastAPI):
         memory_store.clear()
     except Exception:
         pass
+    # Load threat intel here so the first request doesn't pay the init cost
+    await get_threat_intel().maybe_refresh()
     logger.info("Background services started.")
     yield
     logger.info("Guardian API shutting down...")
     logging_client.shutdown()
     await health_monitor.close()
+    await close_client()
     logger.info("Guardian API shutdown complete.")
 
 
@@ -87,6 +92,7 @@ app = FastAPI(
         "url": "https://opensource.org/licenses/MIT",
     },
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 if settings.prometheus_metrics_enabled:
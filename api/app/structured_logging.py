@@ -1,6 +1,7 @@
+import base64
 import logging
+import os
 import sys
-import uuid
 from contextvars import ContextVar
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
@@ -17,14 +18,23 @@ trace_id_var: ContextVar[str] = ContextVar("trace_id", default="")
 
 # --- Correlation ID Management ---
 
+_urandom = os.urandom
+_b64encode = base64.urlsafe_b64encode
+
+
+def _rand_id(prefix: str) -> str:
+    """Builds a prefixed 8-character random ID from 6 bytes of entropy."""
+    return f"{prefix}-{_b64encode(_urandom(6)).rstrip(b'=').decode()}"
+
+
 def generate_correlation_id() -> str:
     """Generates a unique correlation ID for a request."""
-    return f"corr-{uuid.uuid4().hex[:12]}"
+    return _rand_id("corr")
 
 
 def generate_trace_id() -> str:
     """Generates a unique trace ID for a request flow."""
-    return f"trace-{uuid.uuid4().hex[:12]}"
+    return _rand_id("trace")
 
 
 @dataclass
@@ -50,11 +60,14 @@ def get_current_context() -> CorrelationContext:
 
 def _add_correlation_info(logger: Any, method_name: str, event_dict: Dict) -> Dict:
     """A structlog processor to add correlation IDs to all log entries."""
-    context = get_current_context()
-    if context.correlation_id:
-        event_dict["correlation_id"] = context.correlation_id
-    if context.trace_id:
-        event_dict["trace_id"] = context.trace_id
+    # Read the vars directly; this runs for every log line, including startup
+    # logs where both are empty, so avoid building a CorrelationContext.
+    correlation_id = correlation_id_var.get()
+    if correlation_id:
+        event_dict["correlation_id"] = correlation_id
+    trace_id = trace_id_var.get()
+    if trace_id:
+        event_dict["trace_id"] = trace_id
     return event_dict
 
 
@@ -1,14 +1,61 @@
+import asyncio
 import json
 import os
 import re
 import time
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
 from urllib.parse import urlparse
 
 import httpx
+import orjson
 from .logging_client import logger
 from .config import settings
+from .http import get_client
+
+# Per-request work limits to bound worst-case regex backtracking on hostile input
+MAX_ANALYZE_CHARS = 64 * 1024
+MAX_INTEL_MATCHES = 500
+
+# After a failed feed refresh, retry this soon instead of waiting a full TTL
+INTEL_REFRESH_RETRY_SECONDS = 300
+
+# Risk factor and per-match increment for each known_patterns category
+CATEGORY_RISK_WEIGHTS: Dict[str, Tuple[str, float]] = {
+    "get_rich_patterns": ("get_rich_risk", 0.3),
+    "credential_patterns": ("credential_risk", 0.4),
+    "urgency_patterns": ("urgency_risk", 0.2),
+    "social_patterns": ("social_risk", 0.25),
+}
+
+_URL_RE = re.compile(r'https?://[^\s<>"]+|www\.[^\s<>"]+')
+
+
+class Match(NamedTuple):
+    """A single threat intelligence hit within analyzed text."""
+
+    pattern: str
+    matched_text: str
+    category: str
+    start: int
+    end: int
+
+
+def _fast_host(url: str) -> str:
+    """Extract the lowercase host from a URL without building a ParseResult."""
+    u = url.lower().removeprefix("https://").removeprefix("http://").removeprefix("www.")
+    return u.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0]
+
+
+def _extract_host(url: str) -> str:
+    """Return the host for a feed/text URL, falling back to urlparse when the fast path fails."""
+    host = _fast_host(url)
+    if host:
+        return host
+    return urlparse(url).netloc.lower()
+
 
 class ThreatIntelligence:
     def __init__(self):
@@ -51,105 +98,224 @@ class ThreatIntelligence:
         self._load_external_intel()
         
     def _load_external_intel(self):
-        """Load threat intelligence from external sources"""
+        """
+        Load threat intelligence from the on-disk cache.
+
+        No network I/O happens here. A missing or expired cache is served as-is
+        and replaced in the background by maybe_refresh().
+        """
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refreshed_at = 0.0
+        self._retry_at = 0.0
+        self._set_external_intel({
+            "suspicious_domains": [],
+            "phishing_patterns": [],
+            "scam_indicators": []
+        })
         # Path to cached intel data
         cache_dir = Path(__file__).parent / "data"
+        self._cache_file = cache_dir / "threat_intel_cache.json"
         try:
             cache_dir.mkdir(exist_ok=True)
-            cache_file = cache_dir / "threat_intel_cache.json"
-            
-            cache_ttl = getattr(settings, 'threat_intel_cache_ttl', 86400)  # 24h default
-            
-            try:
-                if cache_file.exists() and (time.time() - cache_file.stat().st_mtime < cache_ttl):
-                    with open(cache_file, 'r', encoding='utf-8') as f:
-                        self.external_intel = json.load(f)
-                else:
-                    self.external_intel = self._fetch_external_intel()
-                    with open(cache_file, 'w', encoding='utf-8') as f:
-                        json.dump(self.external_intel, f, indent=2)
-            except (json.JSONDecodeError, IOError) as e:
-                logger.error(f"Error accessing threat intel cache: {str(e)}")
-                self.external_intel = self._fetch_external_intel()
+            if self._cache_file.exists():
+                with open(self._cache_file, 'r', encoding='utf-8') as f:
+                    self._set_external_intel(json.load(f))
+                self._refreshed_at = self._cache_file.stat().st_mtime
+        except (json.JSONDecodeError, IOError) as e:
+            logger.error(f"Error accessing threat intel cache: {str(e)}")
         except Exception as e:
             logger.error(f"Error loading external intel: {str(e)}")
-            self.external_intel = {
-                "suspicious_domains": [],
-                "phishing_patterns": [],
-                "scam_indicators": []
-            }
-            
-    def _fetch_external_intel(self) -> Dict:
+
+    def _set_external_intel(self, intel: Dict, domains: Optional[FrozenSet[str]] = None) -> None:
+        """Swap in new intel; readers see either the old or new domain set, never a mix."""
+        if domains is None:
+            domains = frozenset(intel.get("suspicious_domains", []))
+        self.external_intel = intel
+        self._suspicious_domains: FrozenSet[str] = domains
+
+    async def maybe_refresh(self) -> None:
+        """Schedule a background feed refresh if the cache has expired."""
+        cache_ttl = getattr(settings, 'threat_intel_cache_ttl', 86400)  # 24h default
+        now = time.time()
+        if now - self._refreshed_at < cache_ttl or now < self._retry_at:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._do_refresh())
+
+    async def _do_refresh(self) -> None:
+        """
+        Fetch fresh feeds with the shared client and rewrite the cache file.
+
+        If no feed yields any domains (e.g. every feed errored), the current
+        intel and cache file are kept and the refresh is retried after
+        INTEL_REFRESH_RETRY_SECONDS.
+        """
+        async with self._refresh_lock:
+            try:
+                intel = await self._fetch_external_intel(get_client())
+                if not intel["suspicious_domains"]:
+                    logger.warning(
+                        "Threat intel refresh returned no domains; keeping current intel"
+                    )
+                    self._retry_at = time.time() + INTEL_REFRESH_RETRY_SECONDS
+                    return
+                # Serialising, writing and indexing a large feed would stall
+                # the event loop, so only the final swap happens on it
+                intel, domains = await asyncio.to_thread(self._store_intel, intel)
+                self._set_external_intel(intel, domains)
+                self._refreshed_at = time.time()
+            except Exception as e:
+                logger.error(f"Error refreshing external intel: {str(e)}")
+                self._retry_at = time.time() + INTEL_REFRESH_RETRY_SECONDS
+
+    def _store_intel(self, intel: Dict) -> Tuple[Dict, FrozenSet[str]]:
+        """Write intel to the cache file and build its domain lookup set (blocking)."""
+        try:
+            intel = self._write_intel_cache(self._cache_file, intel)
+        except (IOError, OSError) as e:
+            logger.error(f"Error writing threat intel cache: {str(e)}")
+        return intel, frozenset(intel["suspicious_domains"])
+
+    def _write_intel_cache(self, cache_file: Path, intel: Dict) -> Dict:
+        """
+        Atomically write intel to the cache file, bounded by MAX_INTEL_CACHE_MB.
+
+        When the serialized payload is too large the oldest suspicious domains
+        are dropped (the list is kept in recency order, newest last) until it
+        fits. Returns the intel that was actually written.
+        """
+        max_bytes = getattr(settings, 'max_intel_cache_mb', 50) * 1024 * 1024
+        payload = orjson.dumps(intel)
+
+        domains = intel.get("suspicious_domains", [])
+        original_count = len(domains)
+        if len(payload) > max_bytes and domains:
+            # Drop the oldest domains until their encoded size (each plus its
+            # comma separator) covers the overshoot, then encode once more
+            overshoot = len(payload) - max_bytes
+            dropped = freed = 0
+            while freed < overshoot and dropped < len(domains):
+                freed += len(orjson.dumps(domains[dropped])) + 1
+                dropped += 1
+            domains = domains[dropped:]
+            intel = {**intel, "suspicious_domains": domains}
+            payload = orjson.dumps(intel)
+
+        if len(domains) < original_count:
+            logger.warning(
+                f"Threat intel cache exceeded {max_bytes // (1024 * 1024)}MB; "
+                f"trimmed suspicious_domains from {original_count} to {len(domains)}"
+            )
+
+        if len(payload) > max_bytes:
+            logger.warning("Threat intel cache still exceeds size limit; not writing cache file")
+            return intel
+
+        tmp_file = cache_file.with_suffix(cache_file.suffix + ".tmp")
+        tmp_file.write_bytes(payload)
+        os.replace(tmp_file, cache_file)
+        return intel
+
+    async def _fetch_external_intel(self, client: httpx.AsyncClient) -> Dict:
         """
         Fetch threat intelligence from external sources.
         
+        Only the downloads run on the event loop; parsing the feed bodies is
+        CPU-bound and runs in a worker thread so it doesn't stall requests.
+        
+        Args:
+            client: Shared AsyncClient used for the feed requests
+
         Returns:
             Dictionary containing suspicious domains, patterns, and indicators
         """
+        timeout = getattr(settings, 'threat_intel_timeout', 30)
+        phishtank_body: Optional[bytes] = None
+        openphish_body: Optional[bytes] = None
+        
+        # PhishTank
+        if getattr(settings, 'phishtank_api_key', None):
+            try:
+                r = await client.get(
+                    "http://data.phishtank.com/data/online-valid.json",
+                    headers={"Api-Key": settings.phishtank_api_key},
+                    timeout=timeout,
+                )
+                r.raise_for_status()
+                phishtank_body = r.content
+            except Exception as e:
+                logger.error(f"Error fetching from PhishTank: {str(e)}")
+                
+        # OpenPhish
+        try:
+            r = await client.get("https://openphish.com/feed.txt", timeout=timeout)
+            r.raise_for_status()
+            openphish_body = r.content
+        except Exception as e:
+            logger.error(f"Error fetching from OpenPhish: {str(e)}")
+            
+        return await asyncio.to_thread(self._parse_feeds, phishtank_body, openphish_body)
+
+    @staticmethod
+    def _parse_feeds(phishtank_body: Optional[bytes], openphish_body: Optional[bytes]) -> Dict:
+        """Extract suspicious domains from raw feed bodies, newest last."""
         intel = {
-            "suspicious_domains": set(),
+            # Insertion-ordered so the cache writer can drop the oldest entries first
+            "suspicious_domains": OrderedDict(),
             "phishing_patterns": set(),
             "scam_indicators": set(),
             "last_updated": time.time()
         }
         
-        timeout = getattr(settings, 'threat_intel_timeout', 30)
+        def add_domain(url: str) -> None:
+            domain = _extract_host(url)
+            if domain:
+                intel["suspicious_domains"][domain] = None
+                intel["suspicious_domains"].move_to_end(domain)
         
-        # Add known phishing domains
-        try:
-            with httpx.Client(timeout=timeout) as client:
-                # PhishTank
-                if getattr(settings, 'phishtank_api_key', None):
+        if phishtank_body is not None:
+            try:
+                for entry in orjson.loads(phishtank_body):
                     try:
-                        r = client.get(
-                            "http://data.phishtank.com/data/online-valid.json",
-                            headers={"Api-Key": settings.phishtank_api_key}
-                        )
-                        r.raise_for_status()
-                        data = r.json()
-                        for entry in data:
-                            try:
-                                domain = urlparse(entry["url"]).netloc
-                                if domain:
-                                    intel["suspicious_domains"].add(domain)
-                            except Exception as e:
-                                logger.warning(f"Error parsing PhishTank URL: {str(e)}")
-                                
+                        add_domain(entry["url"])
                     except Exception as e:
-                        logger.error(f"Error fetching from PhishTank: {str(e)}")
-                        
-                # OpenPhish
+                        logger.warning(f"Error parsing PhishTank URL: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error parsing PhishTank feed: {str(e)}")
+                
+        if openphish_body is not None:
+            for line in openphish_body.decode("utf-8", errors="replace").splitlines():
                 try:
-                    r = client.get("https://openphish.com/feed.txt")
-                    r.raise_for_status()
-                    for line in r.text.splitlines():
-                        try:
-                            if line.strip():
-                                domain = urlparse(line.strip()).netloc
-                                if domain:
-                                    intel["suspicious_domains"].add(domain)
-                        except Exception as e:
-                            logger.warning(f"Error parsing OpenPhish URL: {str(e)}")
-                            
+                    if line.strip():
+                        add_domain(line.strip())
                 except Exception as e:
-                    logger.error(f"Error fetching from OpenPhish: {str(e)}")
-                    
-        except Exception as e:
-            logger.error(f"Error fetching external intel: {str(e)}")
+                    logger.warning(f"Error parsing OpenPhish URL: {str(e)}")
             
         # Convert sets to lists for JSON serialization
         return {
-            "suspicious_domains": sorted(list(intel["suspicious_domains"])),
+            "suspicious_domains": list(intel["suspicious_domains"]),
             "phishing_patterns": sorted(list(intel["phishing_patterns"])),
             "scam_indicators": sorted(list(intel["scam_indicators"])),
             "last_updated": intel["last_updated"]
         }
         
-    def analyze_text(self, text: str) -> Dict:
+    def analyze_text(self, text: str, detail: bool = True) -> Dict:
         """
         Analyze text using various threat intelligence sources
-        Returns dict with matched patterns and risk scores
+        Returns dict with matched patterns (as Match tuples) and risk scores
+
+        With detail=False no matches are recorded and each category stops
+        scanning as soon as its risk factor saturates at 1.0; the returned
+        risk_factors are identical either way.
         """
+        if len(text) > MAX_ANALYZE_CHARS:
+            logger.warning(
+                f"Threat intel input of {len(text)} chars truncated to {MAX_ANALYZE_CHARS}"
+            )
+            text = text[:MAX_ANALYZE_CHARS]
+
         results = {
             "matches": [],
             "risk_factors": {
@@ -161,42 +327,52 @@ class ThreatIntelligence:
             }
         }
         
+        risk_factors = results["risk_factors"]
+        remaining = MAX_INTEL_MATCHES
+
         # Check each pattern category
         for category, patterns in self.known_patterns.items():
+            risk_key, weight = CATEGORY_RISK_WEIGHTS[category]
+            saturated = False
             for pattern in patterns:
+                if remaining <= 0 or saturated:
+                    break
                 matches = re.finditer(pattern, text, re.IGNORECASE)
                 for match in matches:
-                    results["matches"].append({
-                        "pattern": pattern,
-                        "matched_text": match.group(0),
-                        "category": category,
-                        "start": match.start(),
-                        "end": match.end()
-                    })
+                    if detail:
+                        results["matches"].append(
+                            Match(pattern, match.group(0), category, match.start(), match.end())
+                        )
                     
                     # Update risk scores
-                    if "get_rich" in category:
-                        results["risk_factors"]["get_rich_risk"] += 0.3
-                    elif "credential" in category:
-                        results["risk_factors"]["credential_risk"] += 0.4
-                    elif "urgency" in category:
-                        results["risk_factors"]["urgency_risk"] += 0.2
-                    elif "social" in category:
-                        results["risk_factors"]["social_risk"] += 0.25
+                    risk_factors[risk_key] += weight
+                    remaining -= 1
+                    if remaining <= 0:
+                        break
+                    # Further hits can't raise a capped score, so skip them when only scoring
+                    if not detail and risk_factors[risk_key] >= 1.0:
+                        saturated = True
+                        break
         
-        # Check for known malicious domains
-        urls = re.finditer(r'https?://[^\s<>"]+|www\.[^\s<>"]+', text)
+        # Check for known malicious domains; the substring checks are a cheap
+        # C-level pre-filter that skips the regex scan for URL-free text
+        urls = _URL_RE.finditer(text) if "http" in text or "www." in text else ()
         for url in urls:
-            domain = urlparse(url.group()).netloc
-            if domain in self.external_intel.get("suspicious_domains", []):
-                results["matches"].append({
-                    "pattern": "known_malicious_domain",
-                    "matched_text": domain,
-                    "category": "known_threat",
-                    "start": url.start(),
-                    "end": url.end()
-                })
-                results["risk_factors"]["known_threat_risk"] += 0.5
+            if remaining <= 0:
+                break
+            domain = _extract_host(url.group())
+            if domain in self._suspicious_domains:
+                if detail:
+                    results["matches"].append(
+                        Match("known_malicious_domain", domain, "known_threat", url.start(), url.end())
+                    )
+                risk_factors["known_threat_risk"] += 0.5
+                remaining -= 1
+                if not detail and risk_factors["known_threat_risk"] >= 1.0:
+                    break
+
+        if remaining <= 0:
+            logger.warning(f"Threat intel match cap of {MAX_INTEL_MATCHES} reached; remaining matches skipped")
                 
         # Calculate final risk scores
         for key in results["risk_factors"]:
@@ -204,5 +380,7 @@ class ThreatIntelligence:
             
         return results
 
-# Initialize global instance
-threat_intel = ThreatIntelligence()
+@lru_cache(maxsize=1)
+def get_threat_intel() -> ThreatIntelligence:
+    """Returns the shared ThreatIntelligence instance, loading it on first use."""
+    return ThreatIntelligence()
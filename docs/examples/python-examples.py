@@ -15,6 +15,7 @@ import asyncio
 
 try:
     from guardian_sdk import (
+        AsyncGuardian,
         Guardian,
         GuardianConfig,
         GuardianError,
@@ -69,15 +70,20 @@ async def batch_processing_example():
         "Another normal message."
     ]
 
-    async def analyze_text_async(client, text):
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, lambda: client.analyze(text))
+    # Cap concurrent requests so large batches don't flood the API or memory
+    semaphore = asyncio.Semaphore(32)
 
-    with Guardian(api_key=API_KEY) as client:
-        tasks = [analyze_text_async(client, text) for text in texts_to_analyze]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    async with AsyncGuardian(api_key=API_KEY) as client:
+        async def analyze_one(text):
+            async with semaphore:
+                try:
+                    return text, await client.analyze(text)
+                except GuardianError as e:
+                    return text, e
 
-        for text, result in zip(texts_to_analyze, results):
+        # Print each result as soon as it arrives rather than waiting for the slowest
+        for next_result in asyncio.as_completed([analyze_one(t) for t in texts_to_analyze]):
+            text, result = await next_result
             if isinstance(result, GuardianError):
                 print(f'Error analyzing "{text[:20]}...": {result}')
             else:
@@ -93,7 +99,8 @@ async def batch_processing_example():
 # from guardian_sdk import Guardian
 
 # app = Flask(__name__)
-# guardian_client = Guardian(api_key=API_KEY)
+# # One shared client per process, so every request reuses the same keep-alive pool
+# guardian_client = Guardian.shared(api_key=API_KEY)
 
 # @app.route("/analyze", methods=["POST"])
 def analyze_endpoint():
@@ -127,6 +134,11 @@ def advanced_configuration():
 if __name__ == "__main__":
     basic_analysis()
     error_handling_example()
+    try:
+        import uvloop  # Optional: faster event loop for the async example
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(batch_processing_example())
     advanced_configuration()
     print("\nFlask example is commented out. See file for implementation details.")
@@ -1,5 +1,6 @@
 from .client import (
     Guardian,
+    AsyncGuardian,
     GuardianConfig,
     GuardianError,
     GuardianAPIError,
@@ -10,6 +11,7 @@ from .client import (
 
 __all__ = [
     "Guardian",
+    "AsyncGuardian",
     "GuardianConfig",
     "GuardianError",
     "GuardianAPIError",
@@ -1,22 +1,37 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import email.utils
+import functools
+import hashlib
+import json
 import logging
 import os
 import random
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple, Union
 
 import httpx
 import structlog
-from tenacity import (
-    RetryError,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
 from typing_extensions import Self
 
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # orjson is an optional speedup (the "fast" extra)
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _json_loads = json.loads
+
 # --- Custom Exceptions ---
 
 
@@ -62,12 +77,19 @@ class GuardianConfig:
     max_retries: int = 3
     debug: bool = False
     # Connection pooling settings
-    http2: bool = False
+    http2: bool = True
     limits: httpx.Limits = field(
         default_factory=lambda: httpx.Limits(
-            max_connections=100, max_keepalive_connections=20
+            max_connections=100, max_keepalive_connections=100, keepalive_expiry=30.0
         )
     )
+    # Response cache for repeated inputs; a TTL of 0 disables it
+    cache_maxsize: int = 1024
+    cache_ttl_seconds: float = 60.0
+    # Send a second copy of a request still pending after this many ms
+    hedge_delay_ms: Optional[int] = None
+    # Custom transport, e.g. httpx.MockTransport in tests; replaces the pool
+    transport: Optional[Union[httpx.BaseTransport, httpx.AsyncBaseTransport]] = None
 
 
 # --- Logging Setup ---
@@ -84,44 +106,160 @@ structlog.configure(
 )
 
 _logger = structlog.get_logger("guardian.sdk")
+# The stdlib logger structlog writes through; checked before building debug output
+_stdlib_logger = logging.getLogger("guardian.sdk")
 
 
-# --- Client ---
+# --- Retry Policy ---
 
+# Upper bound on how long a server-sent Retry-After can stall a call
+_MAX_RETRY_AFTER_SECONDS = 60.0
 
-class Guardian:
-    def __init__(
-        self, config: Optional[GuardianConfig] = None, **kwargs: Any
-    ) -> None:
-        if config is None:
-            config = GuardianConfig(**kwargs)
+# Decorrelated-jitter backoff bounds, in seconds
+_BASE_BACKOFF_SECONDS = 0.5
+_MAX_BACKOFF_SECONDS = 4.0
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given as delta-seconds or an HTTP-date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
 
+
+def _is_retryable_response(response: httpx.Response) -> bool:
+    # Other 4xx responses won't succeed on a retry
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def _retry_delay(backoff: float, response: Optional[httpx.Response]) -> Tuple[float, float]:
+    """
+    Returns ``(sleep, next_backoff)`` for the next retry.
+
+    Backoff uses decorrelated jitter so concurrent clients don't retry in
+    lockstep; a Retry-After header on the response takes precedence.
+    """
+    backoff = min(_MAX_BACKOFF_SECONDS, random.uniform(_BASE_BACKOFF_SECONDS, backoff * 3))
+    if response is not None:
+        retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, _MAX_RETRY_AFTER_SECONDS), backoff
+    return backoff, backoff
+
+
+class _GuardianBase:
+    """Configuration and error handling shared by the sync and async clients."""
+
+    def _configure(self, config: GuardianConfig) -> None:
         self.api_key = config.api_key or os.getenv("GUARDIAN_API_KEY")
         if not self.api_key:
             raise GuardianValidationError(
                 "Missing API key. Provide `api_key` in config or set GUARDIAN_API_KEY."
             )
+        # Encode the header value once; a bad key fails here rather than on first request
+        try:
+            self._api_key_header = self.api_key.encode("ascii")
+        except UnicodeEncodeError:
+            raise GuardianValidationError("API key must contain only ASCII characters.") from None
 
         self.base_url = (
             config.base_url or os.getenv("GUARDIAN_BASE_URL") or "http://localhost:8000"
         ).rstrip("/")
+        # Absolute URL, so httpx skips joining it onto base_url on every call
+        self._analyze_url = httpx.URL(f"{self.base_url}/v1/analyze")
         self.max_retries = config.max_retries
 
-        self._client = httpx.Client(
-            base_url=self.base_url,
-            timeout=config.timeout_seconds,
-            http2=config.http2,
-            limits=config.limits,
-            event_hooks={
-                "request": [self._log_request],
-                "response": [self._log_response],
-            },
+        # Raw response bodies, so each hit decodes into objects the caller owns
+        self._cache: "OrderedDict[bytes, Tuple[float, bytes]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_maxsize = config.cache_maxsize
+        self._cache_ttl = config.cache_ttl_seconds
+        self._hedge_delay = (
+            config.hedge_delay_ms / 1000 if config.hedge_delay_ms is not None else None
         )
+        # Per-request headers; auth lives on the client unless it is shared
+        self._headers: Optional[Dict[str, Any]] = None
+        self._hedged_headers: Dict[str, Any] = {"X-Guardian-Hedge": "1"}
+
+    def _send_auth_per_request(self) -> None:
+        """Sends auth headers with each request, for a client this instance doesn't own."""
+        auth = {"X-API-Key": self._api_key_header, "Content-Type": "application/json"}
+        self._headers = auth
+        self._hedged_headers = {**auth, "X-Guardian-Hedge": "1"}
+
+    def _client_options(self, config: GuardianConfig) -> Dict[str, Any]:
+        """Keyword arguments common to httpx.Client and httpx.AsyncClient."""
+        options = {
+            "base_url": self.base_url,
+            "timeout": config.timeout_seconds,
+            "http2": config.http2,
+            "limits": config.limits,
+            "headers": {"X-API-Key": self._api_key_header, "Content-Type": "application/json"},
+        }
+        if config.transport is not None:
+            options["transport"] = config.transport
+        return options
+
+    @staticmethod
+    def _build_payload(text: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(text, str) or not text.strip():
+            raise GuardianValidationError("Input `text` must be a non-empty string.")
 
-        if config.debug:
-            self.enable_debug_logging()
+        if not kwargs:
+            return {"text": text}
 
-    def _log_request(self, request: httpx.Request):
+        payload = {"text": text}
+        if "config" in kwargs:
+            payload["config"] = kwargs["config"]
+        return payload
+
+    def _request_headers(self, hedge: bool) -> Optional[Dict[str, Any]]:
+        # The hedge header lets the server recognise and deduplicate the duplicate
+        return self._hedged_headers if hedge else self._headers
+
+    @staticmethod
+    def _cache_key(payload: Dict[str, Any]) -> bytes:
+        digest = hashlib.blake2b(payload["text"].encode(), digest_size=16)
+        if "config" in payload:
+            digest.update(json.dumps(payload["config"], sort_keys=True).encode())
+        return digest.digest()
+
+    def _cache_get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Returns a freshly decoded cached result, or None on a miss."""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, body = entry
+            if time.monotonic() - stored_at > self._cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+
+        result = _json_loads(body)
+        # The cached request_id belongs to the original call
+        result["request_id"] = None
+        return result
+
+    def _cache_put(self, key: bytes, body: bytes) -> None:
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), body)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_maxsize:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _log_request_sync(request: httpx.Request):
         _logger.debug(
             "Sending request",
             method=request.method,
@@ -129,59 +267,30 @@ class Guardian:
             headers={k: v for k, v in request.headers.items() if k.lower() != "x-api-key"},
         )
 
-    def _log_response(self, response: httpx.Response):
-        response.read()  # Ensure response body is available for logging
+    @staticmethod
+    def _log_response_body(response: httpx.Response):
         _logger.debug(
             "Received response",
             status_code=response.status_code,
             url=str(response.url),
-            json=response.json() if "application/json" in response.headers.get("content-type", "") else None,
+            json=_json_loads(response.content) if "application/json" in response.headers.get("content-type", "") else None,
         )
 
-    def analyze(self, text: str, **kwargs: Any) -> Dict[str, Any]:
-        """Analyzes the given text for security risks."""
-        if not isinstance(text, str) or not text.strip():
-            raise GuardianValidationError("Input `text` must be a non-empty string.")
-
-        payload = {"text": text}
-        if "config" in kwargs:
-            payload["config"] = kwargs["config"]
+    def _retries_exhausted(self, exc: Exception) -> GuardianTimeoutError:
+        _logger.error("Request failed after multiple retries", exc_info=exc)
+        return GuardianTimeoutError(f"Request failed after {self.max_retries} attempts.")
 
-        headers = {"X-API-Key": self.api_key, "Content-Type": "application/json"}
+    @staticmethod
+    def _log_retry(attempt: int, wait_time: float) -> None:
+        _logger.warning("Retrying request", attempt=attempt, wait_time=wait_time)
 
-        try:
-            retry_decorator = self._create_retry_decorator()
-            response = retry_decorator(self._client.post)(
-                "/v1/analyze", json=payload, headers=headers
-            )
-            response.raise_for_status()
-            return response.json()
-        except RetryError as e:
-            _logger.error("Request failed after multiple retries", exc_info=e)
-            raise GuardianTimeoutError(
-                f"Request failed after {self.max_retries} attempts."
-            ) from e
-        except httpx.HTTPStatusError as e:
-            self._handle_http_status_error(e)
-
-    def _create_retry_decorator(self):
-        """Creates a tenacity retry decorator with exponential backoff and jitter."""
-        return retry(
-            stop=stop_after_attempt(self.max_retries),
-            wait=wait_exponential(multiplier=1, min=1, max=10),
-            retry=retry_if_exception_type((httpx.TimeoutException, httpx.RequestError, GuardianRateLimitError)),
-            before_sleep=lambda s: _logger.warning(
-                "Retrying request", attempt=s.attempt_number, wait_time=s.next_action.sleep
-            ),
-        )
-
-    def _handle_http_status_error(self, exc: httpx.HTTPStatusError) -> None:
-        """Translates HTTP errors into specific Guardian exceptions."""
-        status = exc.response.status_code
-        data = exc.response.json()
+    def _raise_api_error(self, response: httpx.Response) -> None:
+        """Translates an unsuccessful response into a specific Guardian exception."""
+        status = response.status_code
+        data = response.json()
 
         if status == 429:
-            retry_after = int(exc.response.headers.get("Retry-After", "0"))
+            retry_after = int(_parse_retry_after(response.headers.get("Retry-After")) or 0)
             _logger.warning("Rate limit exceeded", retry_after=retry_after)
             raise GuardianRateLimitError(
                 "Rate limit exceeded", status, data, retry_after
@@ -191,20 +300,351 @@ class Guardian:
             raise GuardianAPIError(f"Client error: {data.get('detail', 'Unknown')}", status, data)
         elif 500 <= status < 600:
             _logger.error("API server error", status_code=status, response=data)
-            # This will be retried by tenacity
             raise GuardianAPIError(f"Server error: {data.get('detail', 'Unknown')}", status, data)
+        raise GuardianAPIError("Unexpected response", status, data)
 
     def enable_debug_logging(self):
         """Enables verbose debug logging for the SDK."""
         logging.basicConfig(level=logging.DEBUG, format="%(message)s")
         _logger.info("Debug logging enabled.")
 
+
+class Guardian(_GuardianBase):
+    def __init__(
+        self,
+        config: Optional[GuardianConfig] = None,
+        *,
+        http_client: Optional[httpx.Client] = None,
+        **kwargs: Any,
+    ) -> None:
+        if config is None:
+            config = GuardianConfig(**kwargs)
+
+        self._configure(config)
+        self._owns_client = http_client is None
+        if http_client is None:
+            http_client = self._build_client(config)
+        else:
+            self._send_auth_per_request()
+        self._client = http_client
+        self._client_post = self._client.post
+
+        self._hedge_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        if self._hedge_delay is not None:
+            # One worker per pooled connection, so hedging never caps concurrency
+            # below what the connection pool allows
+            self._hedge_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=config.limits.max_connections or 100,
+                thread_name_prefix="guardian-hedge",
+            )
+
+        if config.debug:
+            self.enable_debug_logging()
+
+    def _build_client(self, config: GuardianConfig) -> httpx.Client:
+        """Creates the httpx client this instance owns; override to customise it."""
+        return httpx.Client(
+            **self._client_options(config),
+            event_hooks={
+                "request": [self._log_request],
+                "response": [self._log_response],
+            },
+        )
+
+    def _log_request(self, request: httpx.Request):
+        if _stdlib_logger.isEnabledFor(logging.DEBUG):
+            self._log_request_sync(request)
+
+    def _log_response(self, response: httpx.Response):
+        # Skip reading and parsing the body unless it will actually be logged
+        if _stdlib_logger.isEnabledFor(logging.DEBUG):
+            response.read()  # Ensure response body is available for logging
+            self._log_response_body(response)
+
+    def _post(self, payload: Dict[str, Any], hedge: bool = False) -> httpx.Response:
+        """
+        Posts the payload, retrying transport errors, 429 and 5xx responses.
+
+        Returns the final response, successful or not; raises
+        GuardianTimeoutError if the last attempt failed in transport.
+        """
+        content = _json_dumps(payload)
+        headers = self._request_headers(hedge)
+        backoff = _BASE_BACKOFF_SECONDS
+        attempt = 1
+        while True:
+            response: Optional[httpx.Response] = None
+            try:
+                response = self._client_post(self._analyze_url, content=content, headers=headers)
+            except httpx.RequestError as exc:
+                if attempt >= self.max_retries:
+                    raise self._retries_exhausted(exc) from exc
+            else:
+                if attempt >= self.max_retries or not _is_retryable_response(response):
+                    return response
+
+            delay, backoff = _retry_delay(backoff, response)
+            self._log_retry(attempt, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(self, payload: Dict[str, Any]) -> httpx.Response:
+        """Posts the payload, hedging with a second request if it is slow to answer."""
+        if self._hedge_executor is None:
+            return self._post(payload)
+
+        started = threading.Event()
+
+        def post_primary() -> httpx.Response:
+            started.set()
+            return self._post(payload)
+
+        primary = self._hedge_executor.submit(post_primary)
+        # Time the hedge from when the request goes out, not from when it was
+        # queued, so a busy executor does not trigger needless hedges
+        started.wait()
+        try:
+            return primary.result(timeout=self._hedge_delay)
+        except concurrent.futures.TimeoutError:
+            pass
+
+        hedged = self._hedge_executor.submit(self._post, payload, True)
+        error: Optional[BaseException] = None
+        for future in concurrent.futures.as_completed((primary, hedged)):
+            error = future.exception()
+            if error is None:
+                # The loser is left to finish in the background
+                return future.result()
+        raise error
+
+    def analyze(self, text: str, cache: bool = True, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Analyzes the given text for security risks.
+
+        Identical requests within ``cache_ttl_seconds`` are answered from an
+        in-process cache; pass ``cache=False`` to always call the API.
+        """
+        payload = self._build_payload(text, kwargs)
+
+        use_cache = cache and self._cache_ttl > 0
+        if use_cache:
+            key = self._cache_key(payload)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+
+        response = self._send(payload)
+        if not response.is_success:
+            self._raise_api_error(response)
+
+        result = _json_loads(response.content)
+        if use_cache:
+            self._cache_put(key, response.content)
+        return result
+
+    @classmethod
+    def shared(
+        cls,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout_seconds: float = 15.0,
+        max_retries: int = 3,
+    ) -> "Guardian":
+        """
+        Returns a process-wide client for the given settings.
+
+        Repeated calls with the same arguments reuse one client and its
+        keep-alive pool. Do not close the returned client or use it as a
+        context manager.
+        """
+        return _shared_client(api_key, base_url, timeout_seconds, max_retries)
+
+    @classmethod
+    def from_shared_client(
+        cls, client: httpx.Client, config: Optional[GuardianConfig] = None, **kwargs: Any
+    ) -> "Guardian":
+        """
+        Returns a client that sends its requests through an existing ``httpx.Client``.
+
+        Instances with different API keys or settings can then share one
+        connection pool. The httpx client's timeout, limits and transport
+        apply, and closing the Guardian leaves the httpx client open.
+        """
+        return cls(config, http_client=client, **kwargs)
+
     def close(self):
-        """Closes the underlying HTTP client."""
-        self._client.close()
+        """Closes the underlying HTTP client, unless it is shared."""
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        if self._owns_client:
+            self._client.close()
 
     def __enter__(self) -> Self:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        self.close()
\ No newline at end of file
+        self.close()
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_client(
+    api_key: Optional[str], base_url: Optional[str], timeout_seconds: float, max_retries: int
+) -> Guardian:
+    return Guardian(
+        api_key=api_key,
+        base_url=base_url,
+        timeout_seconds=timeout_seconds,
+        max_retries=max_retries,
+    )
+
+
+class AsyncGuardian(_GuardianBase):
+    """asyncio client; use with ``asyncio.gather`` for concurrent analyses."""
+
+    def __init__(
+        self,
+        config: Optional[GuardianConfig] = None,
+        *,
+        http_client: Optional[httpx.AsyncClient] = None,
+        **kwargs: Any,
+    ) -> None:
+        if config is None:
+            # A larger pool suits event-loop fan-out
+            kwargs.setdefault(
+                "limits",
+                httpx.Limits(
+                    max_connections=200, max_keepalive_connections=200, keepalive_expiry=30.0
+                ),
+            )
+            config = GuardianConfig(**kwargs)
+
+        self._configure(config)
+        self._owns_client = http_client is None
+        if http_client is None:
+            http_client = self._build_client(config)
+        else:
+            self._send_auth_per_request()
+        self._client = http_client
+        self._client_post = self._client.post
+
+        if config.debug:
+            self.enable_debug_logging()
+
+    def _build_client(self, config: GuardianConfig) -> httpx.AsyncClient:
+        """Creates the httpx client this instance owns; override to customise it."""
+        return httpx.AsyncClient(
+            **self._client_options(config),
+            event_hooks={
+                "request": [self._log_request],
+                "response": [self._log_response],
+            },
+        )
+
+    async def _log_request(self, request: httpx.Request):
+        if _stdlib_logger.isEnabledFor(logging.DEBUG):
+            self._log_request_sync(request)
+
+    async def _log_response(self, response: httpx.Response):
+        # Skip reading and parsing the body unless it will actually be logged
+        if _stdlib_logger.isEnabledFor(logging.DEBUG):
+            await response.aread()  # Ensure response body is available for logging
+            self._log_response_body(response)
+
+    async def _post(self, payload: Dict[str, Any], hedge: bool = False) -> httpx.Response:
+        """
+        Posts the payload, retrying transport errors, 429 and 5xx responses.
+
+        Returns the final response, successful or not; raises
+        GuardianTimeoutError if the last attempt failed in transport.
+        """
+        content = _json_dumps(payload)
+        headers = self._request_headers(hedge)
+        backoff = _BASE_BACKOFF_SECONDS
+        attempt = 1
+        while True:
+            response: Optional[httpx.Response] = None
+            try:
+                response = await self._client_post(self._analyze_url, content=content, headers=headers)
+            except httpx.RequestError as exc:
+                if attempt >= self.max_retries:
+                    raise self._retries_exhausted(exc) from exc
+            else:
+                if attempt >= self.max_retries or not _is_retryable_response(response):
+                    return response
+
+            delay, backoff = _retry_delay(backoff, response)
+            self._log_retry(attempt, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send(self, payload: Dict[str, Any]) -> httpx.Response:
+        """Posts the payload, hedging with a second request if it is slow to answer."""
+        if self._hedge_delay is None:
+            return await self._post(payload)
+
+        primary = asyncio.ensure_future(self._post(payload))
+        pending = {primary}
+        error: Optional[BaseException] = None
+        # Cancel whatever is still running on every exit, including when the
+        # caller itself is cancelled before or after the hedge fires
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self._hedge_delay)
+            if done:
+                return primary.result()
+
+            pending.add(asyncio.ensure_future(self._post(payload, hedge=True)))
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def analyze(self, text: str, cache: bool = True, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Analyzes the given text for security risks.
+
+        Identical requests within ``cache_ttl_seconds`` are answered from an
+        in-process cache; pass ``cache=False`` to always call the API.
+        """
+        payload = self._build_payload(text, kwargs)
+
+        use_cache = cache and self._cache_ttl > 0
+        if use_cache:
+            key = self._cache_key(payload)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+
+        response = await self._send(payload)
+        if not response.is_success:
+            self._raise_api_error(response)
+
+        result = _json_loads(response.content)
+        if use_cache:
+            self._cache_put(key, response.content)
+        return result
+
+    @classmethod
+    def from_shared_client(
+        cls, client: httpx.AsyncClient, config: Optional[GuardianConfig] = None, **kwargs: Any
+    ) -> "AsyncGuardian":
+        """Async counterpart of :meth:`Guardian.from_shared_client`."""
+        return cls(config, http_client=client, **kwargs)
+
+    async def aclose(self):
+        """Closes the underlying HTTP client, unless it is shared."""
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
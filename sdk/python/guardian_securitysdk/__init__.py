@@ -1,5 +1,6 @@
 from guardian_sdk import (
     Guardian,
+    AsyncGuardian,
     GuardianConfig,
     GuardianError,
     GuardianAPIError,
@@ -10,6 +11,7 @@ from guardian_sdk import (
 
 __all__ = [
     "Guardian",
+    "AsyncGuardian",
     "GuardianConfig",
     "GuardianError",
     "GuardianAPIError",
@@ -19,10 +19,15 @@ setup(
         "guardian_securitysdk.*",
     ]),
     install_requires=[
-        "httpx>=0.27.0,<0.28.0",
+        "httpx[http2]>=0.27.0,<0.28.0",
         "structlog>=23.1.0,<24.0.0",
-        "tenacity>=8.2.0,<9.0.0",
         "typing-extensions>=4.0.0",
     ],
+    extras_require={
+        "fast": [
+            "orjson>=3.9",
+            "uvloop>=0.19; sys_platform != 'win32'",
+        ],
+    },
     python_requires=">=3.8",
 )
\ No newline at end of file
@@ -0,0 +1,80 @@
+import os
+import sys
+import types
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "api"))
+
+# app.gemini configures the Gemini SDK (and warns if it can't) at import time
+os.environ.setdefault("GEMINI_API_KEY", "test_key")
+
+from app import gemini  # noqa: E402
+from app.gemini import MAX_REQUESTS, REQUEST_WINDOW, RateLimitExceeded, RequestWindow  # noqa: E402
+
+
+def test_count_sums_buckets_inside_window():
+    window = RequestWindow(60)
+    window.record(100, 5)
+    window.record(130)
+    window.record(159, 3)
+    assert window.count(159) == 9
+
+
+def test_count_expires_buckets_across_wraparound():
+    window = RequestWindow(60)
+    window.record(100, 5)
+    window.record(159, 3)
+
+    # Second 160 maps to the same slot as 100, which has just left the window
+    assert window.count(160) == 3
+    window.record(160)
+    assert window.count(160) == 4
+    assert window.count(219) == 1
+    assert window.count(220) == 0
+
+
+def test_count_ignores_stale_bucket_after_long_gap():
+    window = RequestWindow(60)
+    window.record(100, 7)
+    # 100 + 600 lands on the same slot several laps later
+    assert window.count(700) == 0
+    window.record(700)
+    assert window.count(700) == 1
+
+
+def test_retry_after_at_window_boundary():
+    window = RequestWindow(60)
+    window.record(100)
+    window.record(130)
+    assert window.retry_after(100) == 60
+    assert window.retry_after(159) == 1
+    # Once 100 expires, the oldest counted bucket is 130
+    assert window.retry_after(160) == 30
+    # With nothing counted a full window applies
+    assert RequestWindow(60).retry_after(500) == 60
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.5]
+    monkeypatch.setattr(gemini, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    monkeypatch.setattr(
+        gemini, "request_windows", defaultdict(lambda: RequestWindow(REQUEST_WINDOW))
+    )
+    return now
+
+
+def test_check_rate_limit_raises_at_max_requests(clock):
+    for _ in range(MAX_REQUESTS):
+        gemini.check_rate_limit()
+
+    with pytest.raises(RateLimitExceeded, match="60.0 seconds"):
+        gemini.check_rate_limit()
+
+    # The failed call is not counted, and the window reopens a full window later
+    assert gemini.request_windows["api"].count(1000) == MAX_REQUESTS
+    clock[0] += REQUEST_WINDOW
+    gemini.check_rate_limit()
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "sdk" / "python"))
+
+from guardian_sdk import AsyncGuardian, Guardian, GuardianConfig  # noqa: E402
+
+ANALYZE_BODY = {
+    "request_id": "req_1",
+    "risk_score": 80,
+    "threats_detected": [{"category": "phishing_attempt", "confidence_score": 0.9}],
+}
+
+
+def _transport(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=ANALYZE_BODY)
+
+    return httpx.MockTransport(handler)
+
+
+def _mutate(result):
+    result["risk_score"] = 999
+    result["threats_detected"][0]["category"] = "changed"
+    result["threats_detected"].append({"category": "extra"})
+
+
+def _assert_pristine(result):
+    assert result["risk_score"] == 80
+    assert result["threats_detected"] == ANALYZE_BODY["threats_detected"]
+    assert result["request_id"] is None
+
+
+def test_cache_hits_are_isolated_from_caller_mutation():
+    calls = []
+    with Guardian(GuardianConfig(api_key="test_key", transport=_transport(calls))) as client:
+        _mutate(client.analyze("click here"))
+
+        first_hit = client.analyze("click here")
+        _assert_pristine(first_hit)
+        _mutate(first_hit)
+
+        _assert_pristine(client.analyze("click here"))
+    assert len(calls) == 1
+
+
+async def test_async_cache_hits_are_isolated_from_caller_mutation():
+    calls = []
+    config = GuardianConfig(api_key="test_key", transport=_transport(calls))
+    async with AsyncGuardian(config) as client:
+        _mutate(await client.analyze("click here"))
+
+        first_hit = await client.analyze("click here")
+        _assert_pristine(first_hit)
+        _mutate(first_hit)
+
+        _assert_pristine(await client.analyze("click here"))
+    assert len(calls) == 1
@@ -0,0 +1,166 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "sdk" / "python"))
+
+from guardian_sdk import (  # noqa: E402
+    AsyncGuardian,
+    Guardian,
+    GuardianAPIError,
+    GuardianConfig,
+    GuardianRateLimitError,
+    GuardianTimeoutError,
+)
+from guardian_sdk import client as client_module  # noqa: E402
+
+OK_BODY = {"request_id": "req_1", "risk_score": 10, "threats_detected": []}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records retry sleeps instead of waiting them out."""
+    recorded = []
+
+    async def fake_async_sleep(delay):
+        recorded.append(delay)
+
+    monkeypatch.setattr(client_module.time, "sleep", recorded.append)
+    monkeypatch.setattr(client_module.asyncio, "sleep", fake_async_sleep)
+    return recorded
+
+
+def _client(responses, calls, max_retries=3):
+    """A Guardian whose transport replays `responses` in order (exceptions are raised)."""
+    replies = iter(responses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    config = GuardianConfig(
+        api_key="test_key",
+        max_retries=max_retries,
+        cache_ttl_seconds=0,
+        transport=httpx.MockTransport(handler),
+    )
+    return Guardian(config)
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503])
+def test_retryable_status_is_retried(sleeps, status):
+    calls = []
+    responses = [httpx.Response(status, json={"detail": "busy"}), httpx.Response(200, json=OK_BODY)]
+    with _client(responses, calls) as client:
+        assert client.analyze("hello")["risk_score"] == 10
+    assert len(calls) == 2
+    assert len(sleeps) == 1
+
+
+@pytest.mark.parametrize("status", [400, 401, 403, 404, 422])
+def test_other_client_errors_are_not_retried(sleeps, status):
+    calls = []
+    with _client([httpx.Response(status, json={"detail": "nope"})], calls) as client:
+        with pytest.raises(GuardianAPIError) as exc_info:
+            client.analyze("hello")
+    assert exc_info.value.status_code == status
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_server_errors_raise_after_max_retries(sleeps):
+    calls = []
+    responses = [httpx.Response(503, json={"detail": "down"})] * 3
+    with _client(responses, calls, max_retries=3) as client:
+        with pytest.raises(GuardianAPIError) as exc_info:
+            client.analyze("hello")
+    assert exc_info.value.status_code == 503
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_transport_errors_become_timeout_error_after_max_retries(sleeps):
+    calls = []
+    responses = [httpx.ConnectError("refused")] * 3
+    with _client(responses, calls, max_retries=3) as client:
+        with pytest.raises(GuardianTimeoutError):
+            client.analyze("hello")
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+async def test_async_transport_errors_become_timeout_error(sleeps):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        raise httpx.ReadTimeout("slow")
+
+    config = GuardianConfig(
+        api_key="test_key", max_retries=2, transport=httpx.MockTransport(handler)
+    )
+    async with AsyncGuardian(config) as client:
+        with pytest.raises(GuardianTimeoutError):
+            await client.analyze("hello")
+    assert len(calls) == 2
+    assert len(sleeps) == 1
+
+
+def test_rate_limit_error_carries_retry_after(sleeps):
+    calls = []
+    limited = httpx.Response(429, headers={"Retry-After": "30"}, json={"detail": "slow down"})
+    with _client([limited], calls, max_retries=1) as client:
+        with pytest.raises(GuardianRateLimitError) as exc_info:
+            client.analyze("hello")
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.retry_after == 30
+
+
+def test_retry_sleep_honours_retry_after(sleeps):
+    calls = []
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "7"}, json={}),
+        httpx.Response(200, json=OK_BODY),
+    ]
+    with _client(responses, calls) as client:
+        client.analyze("hello")
+    assert sleeps == [7.0]
+
+
+def test_parse_retry_after_delta_seconds():
+    assert client_module._parse_retry_after("30") == 30.0
+    assert client_module._parse_retry_after("-5") == 0.0
+    assert client_module._parse_retry_after(None) is None
+    assert client_module._parse_retry_after("soon") is None
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=120)
+    parsed = client_module._parse_retry_after(format_datetime(when, usegmt=True))
+    assert 115 <= parsed <= 120
+
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert client_module._parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+
+
+def test_retry_delay_caps_retry_after():
+    an_hour_out = format_datetime(datetime.now(timezone.utc) + timedelta(hours=1), usegmt=True)
+    for value in ("3600", an_hour_out):
+        response = httpx.Response(429, headers={"Retry-After": value})
+        delay, _ = client_module._retry_delay(0.5, response)
+        assert delay == client_module._MAX_RETRY_AFTER_SECONDS == 60.0
+
+
+def test_retry_delay_backoff_is_jittered_within_bounds():
+    backoff = client_module._BASE_BACKOFF_SECONDS
+    for _ in range(50):
+        delay, backoff = client_module._retry_delay(backoff, None)
+        assert delay == backoff
+        assert client_module._BASE_BACKOFF_SECONDS <= delay <= client_module._MAX_BACKOFF_SECONDS